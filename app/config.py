@@ -2,4 +2,6 @@ import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-DB_FILE_PATH = BASE_DIR / "data" / "database.json"
\ No newline at end of file
+# SODOT_DB_PATH points the app at another database file (e.g. a temporary one in tests)
+# An exported but empty variable counts as unset
+DB_FILE_PATH = Path(os.getenv("SODOT_DB_PATH") or BASE_DIR / "data" / "database.json")
\ No newline at end of file
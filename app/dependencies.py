@@ -5,18 +5,31 @@ from app.services.tasks import TaskService
 from app.config import DB_FILE_PATH
 
 _db_engine = JsonStorageEngine(db_path=DB_FILE_PATH)
+# Stateless wrappers around the engine, built once instead of on every request
+_repository = TaskRepository(db=_db_engine)
+_service = TaskService(repo=_repository)
+
+async def init_storage() -> None:
+    """
+    Loads the database into the engine's in-memory cache.
+    Called once from the app lifespan, before any request is served.
+    """
+    await _db_engine.load()
 
 def get_repository() -> TaskRepository:
     """
-    FastAPI dependency that provides a repository instance.
-    The engine is a singleton, so the lock is shared.
+    FastAPI dependency that provides the repository instance.
+    Like the engine, it is a singleton, so the lock is shared.
     """
-    return TaskRepository(db=_db_engine)
+    return _repository
 
 def get_service(
     repo: TaskRepository = Depends(get_repository)) -> TaskService:
     """
     Provides the Business Logic Service.
     FastAPI automatically injects the repo dependency above.
+    The singleton is reused, unless a different repo was injected (e.g. a test override).
     """
+    if repo is _repository:
+        return _service
     return TaskService(repo=repo)
\ No newline at end of file
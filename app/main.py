@@ -1,16 +1,30 @@
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from app.routers import todos
+from app.dependencies import init_storage
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the storage cache on startup."""
+    await init_storage()
+    yield
+
+
 app = FastAPI(
     title="Sodot To-Do API",
     description="A RESTful API for managing to-do items",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson instead of the stdlib json module for every endpoint's response body
+    default_response_class=ORJSONResponse
 )
 
 
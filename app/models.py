@@ -1,5 +1,5 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import Optional, TypedDict
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -30,6 +30,16 @@ class TaskRecord(TaskBase):
     createdAt: datetime = Field(..., description="Timestamp when the item was created")
 
 
+class TaskRecordDict(TypedDict):
+    """A TaskRecord as held by the storage engine (JSON-ready, dates as ISO strings)."""
+    id: str
+    title: str
+    description: Optional[str]
+    dueDate: Optional[str]
+    isCompleted: bool
+    createdAt: str
+
+
 # --- API Input Models ---
 class TaskCreate(TaskBase):
     """Model for creating a new task (without createdAt, which is auto-generated)."""
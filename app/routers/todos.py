@@ -1,6 +1,7 @@
 import logging
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Path
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Path
+from pydantic import TypeAdapter
 
 from app.models import TaskCreate, TaskResponse, TaskUpdate
 from app.services.tasks import TaskService
@@ -13,7 +14,14 @@ router = APIRouter(
     tags=["todos"]
 )
 
-@router.get("/", response_model=List[TaskResponse])
+# Endpoints return already-serialized dicts, so FastAPI doesn't re-validate the
+# records through a response_model. The schema is still declared here for the docs.
+_TASK_RESPONSE = {status.HTTP_200_OK: {"model": TaskResponse}}
+
+# Built once at import, the list endpoint serializes straight to JSON bytes with it
+_TASK_LIST_ADAPTER = TypeAdapter(List[TaskResponse])
+
+@router.get("/", responses={status.HTTP_200_OK: {"model": List[TaskResponse]}})
 async def list_todos(
     service: TaskService = Depends(get_service)
 ):
@@ -21,10 +29,10 @@ async def list_todos(
     Retrieve all to-do items.
     """
     tasks = await service.list_tasks()
-    logger.info(f"Fetched {len(tasks)} tasks")
-    return tasks
+    logger.info("Fetched %s tasks", len(tasks))
+    return Response(_TASK_LIST_ADAPTER.dump_json(tasks), media_type="application/json")
 
-@router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/", responses={status.HTTP_201_CREATED: {"model": TaskResponse}}, status_code=status.HTTP_201_CREATED)
 async def create_todo(
     task_data: TaskCreate,
     service: TaskService = Depends(get_service)
@@ -32,12 +40,12 @@ async def create_todo(
     """
     Create a new to-do item.
     """
-    logger.info(f"Request to create task: {task_data.title}")
+    logger.info("Request to create task: %s", task_data.title)
     created_task = await service.create_task(task_data)
-    logger.info(f"Successfully created task ID: {created_task.id}")
-    return created_task
+    logger.info("Successfully created task ID: %s", created_task.id)
+    return created_task.model_dump(mode="json")
 
-@router.get("/{task_id}", response_model=TaskResponse)
+@router.get("/{task_id}", responses=_TASK_RESPONSE)
 async def get_todo(
     task_id: str = Path(..., description="The ID of the task to retrieve"),
     service: TaskService = Depends(get_service)
@@ -47,14 +55,14 @@ async def get_todo(
     """
     task = await service.get_task(task_id)
     if not task:
-        logger.warning(f"Get Task failed: ID {task_id} not found")
+        logger.warning("Get Task failed: ID %s not found", task_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
-    return task
+    return task.model_dump(mode="json")
 
-@router.patch("/{task_id}", response_model=TaskResponse)
+@router.patch("/{task_id}", responses=_TASK_RESPONSE)
 async def update_todo(
     task_update: TaskUpdate,
     task_id: str = Path(..., description="The ID of the task to update"),
@@ -64,16 +72,16 @@ async def update_todo(
     Update a to-do item (partial update).
     Modify title, description, due date, or status.
     """
-    logger.info(f"Request to update task ID: {task_id}")
+    logger.info("Request to update task ID: %s", task_id)
     updated_task = await service.update_task(task_id, task_update)
     if not updated_task:
-        logger.warning(f"Update Task failed: ID {task_id} not found")
+        logger.warning("Update Task failed: ID %s not found", task_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
-    logger.info(f"Successfully updated task ID: {task_id}")
-    return updated_task
+    logger.info("Successfully updated task ID: %s", task_id)
+    return updated_task.model_dump(mode="json")
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_todo(
@@ -83,18 +91,18 @@ async def delete_todo(
     """
     Delete a to-do item.
     """
-    logger.info(f"Request to delete task ID: {task_id}")
+    logger.info("Request to delete task ID: %s", task_id)
     deleted = await service.delete_task(task_id)
     if not deleted:
-        logger.warning(f"Delete Task failed: ID {task_id} not found")
+        logger.warning("Delete Task failed: ID %s not found", task_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
-    logger.info(f"Successfully deleted task ID: {task_id}")
+    logger.info("Successfully deleted task ID: %s", task_id)
     return None
 
-@router.post("/{task_id}/complete", response_model=TaskResponse)
+@router.post("/{task_id}/complete", responses=_TASK_RESPONSE)
 async def complete_todo(
     task_id: str = Path(..., description="The ID of the task to mark as complete"),
     service: TaskService = Depends(get_service)
@@ -107,16 +115,16 @@ async def complete_todo(
     
     updated_task = await service.update_task(task_id, update_payload)
     if not updated_task:
-        logger.warning(f"Complete Task failed: ID {task_id} not found")
+        logger.warning("Complete Task failed: ID %s not found", task_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
-    logger.info(f"Successfully marked task {task_id} as complete")
-    return updated_task
+    logger.info("Successfully marked task %s as complete", task_id)
+    return updated_task.model_dump(mode="json")
 
-@router.post("/{task_id}/incomplete", response_model=TaskResponse)
+@router.post("/{task_id}/incomplete", responses=_TASK_RESPONSE)
 async def incomplete_todo(
     task_id: str = Path(..., description="The ID of the task to mark as incomplete"),
     service: TaskService = Depends(get_service)
@@ -129,11 +137,11 @@ async def incomplete_todo(
     
     updated_task = await service.update_task(task_id, update_payload)
     if not updated_task:
-        logger.warning(f"Incomplete Task failed: ID {task_id} not found")
+        logger.warning("Incomplete Task failed: ID %s not found", task_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
-    logger.info(f"Successfully marked task {task_id} as incomplete")
-    return updated_task
\ No newline at end of file
+    logger.info("Successfully marked task %s as incomplete", task_id)
+    return updated_task.model_dump(mode="json")
\ No newline at end of file
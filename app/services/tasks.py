@@ -8,7 +8,7 @@ from app.storage.repository import TaskRepository
 class TaskService:
     """
     Business Logic Layer.
-    Handles ID generation, timestamps, and data merging.
+    Handles ID generation, timestamps, and picking the fields an update changes.
     """
     def __init__(self, repo: TaskRepository):
         self.repo = repo
@@ -20,7 +20,7 @@ class TaskService:
         return await self.repo.get_by_id(task_id)
 
     async def create_task(self, task_create: TaskCreate) -> TaskRecord:
-        new_id = str(uuid.uuid4())
+        new_id = uuid.uuid4().hex
         timestamp = datetime.now()
 
         record = TaskRecord(
@@ -32,14 +32,9 @@ class TaskService:
         return await self.repo.save(record)
 
     async def update_task(self, task_id: str, update_data: TaskUpdate) -> Optional[TaskRecord]:
-        current_record = await self.repo.get_by_id(task_id)
-        if not current_record:
-            return None
-
-        update_dict = update_data.model_dump(exclude_unset=True)
-        updated_record = current_record.model_copy(update=update_dict)
-
-        return await self.repo.save(updated_record)
+        # Only the fields the client sent, in the same JSON form the DB stores them
+        update_dict = update_data.model_dump(mode='json', exclude_unset=True)
+        return await self.repo.update(task_id, update_dict)
 
     async def delete_task(self, task_id: str) -> bool:
         return await self.repo.delete(task_id)
\ No newline at end of file
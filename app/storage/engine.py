@@ -1,55 +1,359 @@
-import json
+import os
 import asyncio
+import logging
 from pathlib import Path
-from typing import Dict, Any, Optional
+import orjson
+from typing import Dict, Any, List, Optional, Tuple
 from app.config import DB_FILE_PATH
 
+logger = logging.getLogger(__name__)
+
 class JsonStorageEngine:
     """
     Handles raw file I/O with concurrency safety.
     Acts as a singleton connection to the JSON file.
+
+    The JSON file holds a snapshot of the data, and every mutation since that
+    snapshot is appended as a single line to a log file next to it. The state
+    is rebuilt once (snapshot + log replay) and then kept in memory, so a
+    mutation only costs one small append instead of a full file rewrite.
+
+    Concurrent mutations are group-committed: whichever writer gets the lock
+    yields once so the writers already scheduled can queue their lines, then
+    appends and fsyncs everything queued so far in one go. The others just wait
+    for their batch to land, so the fsync is paid once per batch, not per write.
     """
+    COMPACT_THRESHOLD = 1000  # Logged operations before the log is folded into the snapshot
+
     def __init__(self, db_path: Path = DB_FILE_PATH):
         self.db_path = db_path
-        self._lock = asyncio.Lock()  # Mutex to prevent race conditions
+        self.log_path = db_path.with_name(db_path.name + ".log")
+        self._lock = asyncio.Lock()  # Mutex to serialize loading and writes
+        self._state: Optional[Dict[str, Any]] = None
+        # Operations waiting for the next flush, with their encoded log lines and the future their writer awaits
+        self._pending: List[Tuple[List[Dict[str, Any]], bytes, asyncio.Future]] = []
+        # An append or compaction still running in a worker thread after the call that started it was cancelled
+        self._inflight: Optional[asyncio.Future] = None
+        self._ops_since_compact = 0
+
+    async def load(self) -> None:
+        """
+        Parses the file into the in-memory cache, if it is not cached yet.
+        Called at startup so the first request does not pay for it.
+        """
+        async with self._lock:
+            await self._ensure_loaded()
 
     async def read(self) -> Dict[str, Any]:
         """
         Thread-safe, non-blocking read.
+        Only the first call touches the disk, later calls return the cached state.
         """
+        # Fast path, no lock needed: mutations are applied to the state in one
+        # synchronous step on the event loop, so readers never see a partial update.
+        state = self._state
+        if state is not None:
+            return state
+
         async with self._lock:
-            # Run the blocking file IO in a separate thread
-            return await asyncio.to_thread(self._load_from_disk)
+            await self._ensure_loaded()
+            return self._state
 
     async def write(self, data: Dict[str, Any]) -> None:
         """
         Thread-safe, non-blocking write.
+        Replaces the whole dataset, so it is written as a fresh snapshot.
         """
         async with self._lock:
-            await asyncio.to_thread(self._save_to_disk, data)
+            # Queued lines belong to the old state, get them out before the snapshot replaces it
+            await self._flush()
+            self._state = data
+            await self._compact_in_thread()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Single-item lookup in the cached state."""
+        data = await self.read()
+        return data.get(key)
+
+    async def put(self, key: str, item: Dict[str, Any]) -> None:
+        """
+        Thread-safe, non-blocking insert/replace of a single item.
+        Only this item is written to disk, as one line appended to the log.
+        """
+        await self._mutate([{"op": "put", "id": key, "record": item}])
+
+    async def put_many(self, items: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Thread-safe, non-blocking insert/replace of several items.
+        One log line per item, all appended in a single write.
+        """
+        if items:
+            await self._mutate([{"op": "put", "id": key, "record": item} for key, item in items.items()])
+
+    async def remove(self, key: str) -> bool:
+        """
+        Thread-safe, non-blocking removal of a single item.
+        Returns True if it was removed, False if there was no such key.
+        """
+        if self._state is None:
+            await self.load()
+        if key not in self._state:
+            # A put for it that is still pending is not acknowledged yet, so answering before it is fine
+            return False
+        # Whether it is still there by the time the delete is logged is decided under the lock
+        return await self._mutate([{"op": "delete", "id": key}]) == 1
+
+    async def remove_many(self, keys: List[str]) -> int:
+        """
+        Thread-safe, non-blocking removal of several items, appended to the log in a single write.
+        Returns how many of the keys existed and were removed.
+        """
+        if self._state is None:
+            await self.load()
+        present = [key for key in dict.fromkeys(keys) if key in self._state]
+        if not present:
+            return 0
+        return await self._mutate([{"op": "delete", "id": key} for key in present])
+
+    async def _ensure_loaded(self) -> None:
+        """Fills the cache from disk on first use. Must be called with the lock held."""
+        if self._state is None:
+            # Run the blocking file IO in a separate thread
+            self._state = await asyncio.to_thread(self._load_from_disk)
+
+    async def _mutate(self, entries: List[Dict[str, Any]]) -> int:
+        """
+        Queues the operations and waits until their log lines are on disk.
+        They are applied to the state only once the append succeeded, in queue order,
+        so readers never see a change that is not durable (or that failed to be written).
+        Returns how many of them were logged, deletes of keys that are gone by then are dropped.
+        """
+        if self._state is None:
+            await self.load()
+        # The record dicts are kept as-is in the state, so each is serialized exactly once, newline included
+        lines = b"".join(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE) for entry in entries)
+        done = asyncio.get_running_loop().create_future()
+        self._pending.append((entries, lines, done))
+
+        async with self._lock:
+            # Unless an earlier writer already flushed it, this line leads the next batch
+            if not done.done():
+                # Taking a free lock never yields, so without this pause the leader would flush alone:
+                # writers that are already scheduled get one loop turn to queue their lines.
+                await asyncio.sleep(0)
+                await self._flush()
+        return await done
+
+    async def _flush(self) -> None:
+        """Appends and fsyncs every pending line to the log in a single write. Must be called with the lock held."""
+        if self._inflight is not None:
+            # The previous append must land first, the log has to keep the queue order.
+            # A previous compaction must finish first, or it would unlink lines appended after its snapshot.
+            await asyncio.wait([self._inflight])
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self._drop_missed_deletes(batch)
+        lines = b"".join(chunk for _, chunk, _ in batch)
+        if not lines:
+            # Nothing but deletes of keys that were already gone
+            self._settle(batch, None)
+            return
+
+        # Always in a worker thread: the fsync would otherwise stall the event loop for every request
+        append = asyncio.ensure_future(asyncio.to_thread(self._append_to_log, lines))
+        try:
+            await asyncio.shield(append)
+        except asyncio.CancelledError:
+            # The worker thread can't be stopped and may still write the batch.
+            # Settle it by what actually happened once the thread is done, so the state matches the disk.
+            self._inflight = append
+            append.add_done_callback(lambda _: self._settle_inflight(batch, append))
+            raise
+        except Exception as e:
+            self._settle(batch, e)
+            return
+
+        self._settle(batch, None)
+        if self._ops_since_compact > self.COMPACT_THRESHOLD:
+            try:
+                await self._compact_in_thread()
+            except Exception:
+                # The batch is already on disk and applied, so its writers must not see this error.
+                # The log is still intact: keep using it and try again after another COMPACT_THRESHOLD operations.
+                logger.exception("Compacting %s failed", self.log_path)
+                self._ops_since_compact = 0
+
+    async def _compact_in_thread(self) -> None:
+        """Runs the compaction in a worker thread. Must be called with the lock held."""
+        compaction = asyncio.ensure_future(asyncio.to_thread(self._compact))
+        try:
+            await asyncio.shield(compaction)
+        except asyncio.CancelledError:
+            # The worker thread can't be stopped and will still unlink the log once its snapshot is saved.
+            # Track it like a cancelled append, so the next flush waits for it before appending anything.
+            self._inflight = compaction
+            compaction.add_done_callback(self._settle_inflight_compaction)
+            raise
+
+    def _drop_missed_deletes(self, batch: List[Tuple[List[Dict[str, Any]], bytes, asyncio.Future]]) -> None:
+        """
+        Removes deletes of keys that no longer exist from a batch, in place.
+        Every earlier batch is settled by now, so the state plus the entries ahead in this batch
+        is exactly what the log holds at that point. This is what makes two concurrent
+        deletes of one key log it (and report it) only once.
+        """
+        present: Dict[str, bool] = {}  # Keys the batch touched so far, and whether they exist after that
+        for i, (entries, chunk, done) in enumerate(batch):
+            kept = []
+            for entry in entries:
+                key = entry["id"]
+                if entry["op"] == "delete":
+                    if not present.get(key, key in self._state):
+                        continue
+                    present[key] = False
+                else:
+                    present[key] = True
+                kept.append(entry)
+            if len(kept) < len(entries):
+                lines = b"".join(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE) for entry in kept)
+                batch[i] = (kept, lines, done)
+
+    def _settle(self, batch: List[Tuple[List[Dict[str, Any]], bytes, asyncio.Future]], error: Optional[BaseException]) -> None:
+        """
+        Finishes a flushed batch. On success its operations are applied to the state,
+        on failure they are dropped and every writer in the batch gets the error from its own await.
+        """
+        if error is not None:
+            for _, _, done in batch:
+                if not done.done():
+                    done.set_exception(error)
+            return
+
+        for entries, _, done in batch:
+            # Applied even if the writer stopped waiting, the lines are on disk either way
+            for entry in entries:
+                self._apply(self._state, entry)
+            self._ops_since_compact += len(entries)
+            if not done.done():
+                done.set_result(len(entries))
+
+    def _settle_inflight(self, batch: List[Tuple[List[Dict[str, Any]], bytes, asyncio.Future]], append: asyncio.Future) -> None:
+        """Done callback for an append whose flush was cancelled while the worker thread was writing."""
+        if self._inflight is append:
+            self._inflight = None
+        if append.cancelled():
+            # Only happens when the loop itself is shutting down, the outcome is unknown
+            for _, _, done in batch:
+                done.cancel()
+            return
+        self._settle(batch, append.exception())
+
+    def _settle_inflight_compaction(self, compaction: asyncio.Future) -> None:
+        """Done callback for a compaction whose caller was cancelled while the worker thread was writing."""
+        if self._inflight is compaction:
+            self._inflight = None
+        if not compaction.cancelled() and compaction.exception() is not None:
+            # Nobody is left to raise it to. The log was not unlinked, so no data was lost.
+            logger.error("Compacting %s failed", self.log_path, exc_info=compaction.exception())
+
+    @staticmethod
+    def _apply(state: Dict[str, Any], entry: Dict[str, Any]) -> None:
+        """Apply a single logged operation to the in-memory state."""
+        if entry["op"] == "put":
+            state[entry["id"]] = entry["record"]
+        elif entry["op"] == "delete":
+            state.pop(entry["id"], None)
 
     # --- Private Synchronous Methods (The "Driver" logic) ---
 
     def _load_from_disk(self) -> Dict[str, Any]:
-        """Internal synchronous method to read the file."""
+        """Internal synchronous method to rebuild the state from the snapshot and the log."""
         # Ensure parent directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
         if not self.db_path.exists():
             self._save_to_disk({})
-            return {}
 
         try:
-            with open(self.db_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data if isinstance(data, dict) else {}
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
+            with open(self.db_path, 'rb') as f:
+                data = orjson.loads(f.read())
+                data = data if isinstance(data, dict) else {}
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            data = {}
+
+        self._ops_since_compact = 0
+        if self.log_path.exists():
+            with open(self.log_path, 'rb') as f:
+                log = f.read()
+
+            good_end = 0  # Byte offset just past the last complete entry
+            while good_end < len(log):
+                line_end = log.find(b"\n", good_end)
+                if line_end == -1:
+                    # A torn final line from an interrupted append, its write was never acknowledged
+                    break
+                try:
+                    entry = orjson.loads(log[good_end:line_end])
+                except orjson.JSONDecodeError as e:
+                    if line_end + 1 < len(log):
+                        # Only the last line can be torn, anything earlier means the log is corrupt
+                        raise ValueError(f"Corrupt entry at byte {good_end} of {self.log_path}") from e
+                    break
+                self._apply(data, entry)
+                self._ops_since_compact += 1
+                good_end = line_end + 1
+
+            if good_end < len(log):
+                # Cut the torn tail off, otherwise the next append would be glued onto it
+                with open(self.log_path, 'r+b') as f:
+                    f.truncate(good_end)
+                    os.fsync(f.fileno())
+
+        return data
+
+    def _append_to_log(self, lines: bytes) -> None:
+        """Internal synchronous method to append a batch of operations to the log and make it durable."""
+        with open(self.log_path, 'ab') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _compact(self) -> None:
+        """Internal synchronous method to fold the log into a fresh snapshot."""
+        tmp_path = self.db_path.with_name(self.db_path.name + ".tmp")
+        try:
+            self._save_to_disk(self._state, path=tmp_path)
+            os.replace(tmp_path, self.db_path)
+        except BaseException:
+            # Don't leave a partial snapshot behind, e.g. after running out of disk space
+            tmp_path.unlink(missing_ok=True)
+            raise
+        self._fsync_dir()
+        # Replaying the log over the new snapshot is idempotent, so a crash before this point is safe
+        self.log_path.unlink(missing_ok=True)
+        self._ops_since_compact = 0
 
-    def _save_to_disk(self, data: Dict[str, Any]) -> None:
+    def _save_to_disk(self, data: Dict[str, Any], path: Optional[Path] = None) -> None:
         """Internal synchronous method to write to file."""
+        path = path or self.db_path
         # Ensure parent directory exists
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(self.db_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, default=str, ensure_ascii=False)
\ No newline at end of file
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # orjson writes UTF-8 bytes and serializes date/datetime natively
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            # Once the log is unlinked after a compaction, this file is the only copy of the data
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _fsync_dir(self) -> None:
+        """Internal synchronous method to make a rename in the data directory durable."""
+        if not hasattr(os, "O_DIRECTORY"):
+            # Windows has no directory fsync, renames there are already durable
+            return
+        fd = os.open(self.db_path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
\ No newline at end of file
@@ -1,10 +1,16 @@
 import uuid
 from datetime import datetime
 from typing import List, Optional
+from pydantic import TypeAdapter
 
-from app.models import TaskCreate, TaskUpdate, TaskRecord
+from app.models import TaskCreate, TaskUpdate, TaskRecord, TaskRecordDict
 from app.storage.engine import JsonStorageEngine
 
+# Compiled once. Validating a whole list in pydantic-core is several times faster
+# than building the records one by one in Python, even with model_construct.
+_RECORD_LIST_ADAPTER = TypeAdapter(List[TaskRecord])
+_RECORD_ADAPTER = TypeAdapter(TaskRecord)
+
 class TaskRepository:
     """
     Pure Data Access Layer. 
@@ -14,32 +20,58 @@ class TaskRepository:
         self.db = db
 
     async def get_all(self) -> List[TaskRecord]:
-        """Fetch all tasks as Internal Records."""
+        """
+        Fetch all tasks as Internal Records.
+        Stored data is trusted, it goes through the adapter only because that is the fastest way to build the list.
+        """
         data = await self.db.read()
-        return [TaskRecord(**item) for item in data.values()]
+        return _RECORD_LIST_ADAPTER.validate_python(list(data.values()))
 
     async def get_by_id(self, task_id: str) -> Optional[TaskRecord]:
         """Fetch a single task by ID."""
-        data = await self.db.read()
-        item = data.get(task_id)
-        return TaskRecord(**item) if item else None
+        item = await self.db.get(task_id)
+        return _RECORD_ADAPTER.validate_python(item) if item else None
 
     async def save(self, record: TaskRecord) -> TaskRecord:
         """
         Persist a full record. 
         Used for both Creation (new ID) and Updates (existing ID).
         """
-        data = await self.db.read()
-        # model_dump(mode='json') ensures datetimes are serialized to ISO strings
-        data[record.id] = record.model_dump(mode='json')
-        await self.db.write(data)
+        await self.db.put(record.id, self._to_item(record))
+        return record
+
+    async def save_many(self, records: List[TaskRecord]) -> List[TaskRecord]:
+        """
+        Persist several full records in one engine call.
+        The engine appends them to its log in a single write instead of one write per record.
+        """
+        await self.db.put_many({record.id: self._to_item(record) for record in records})
+        return records
+
+    async def update(self, task_id: str, changes: dict) -> Optional[TaskRecord]:
+        """
+        Apply a partial update to a stored task. Returns None if not found.
+        changes must already be JSON-ready (model_dump(mode='json')), as they are merged into the stored dict as-is.
+        """
+        item = await self.db.get(task_id)
+        if item is None:
+            return None
+        updated: TaskRecordDict = {**item, **changes}
+        # Validate before writing, so an invalid merge is rejected instead of persisted
+        record = _RECORD_ADAPTER.validate_python(updated)
+        await self.db.put(task_id, updated)
         return record
 
     async def delete(self, task_id: str) -> bool:
         """Remove a task by ID. Returns True if deleted, False if not found."""
-        data = await self.db.read()
-        if task_id in data:
-            del data[task_id]
-            await self.db.write(data)
-            return True
-        return False
\ No newline at end of file
+        return await self.db.remove(task_id)
+
+    async def delete_many(self, task_ids: List[str]) -> int:
+        """Remove several tasks by ID in one engine call. Returns how many were deleted."""
+        return await self.db.remove_many(task_ids)
+
+    @staticmethod
+    def _to_item(record: TaskRecord) -> TaskRecordDict:
+        """Convert a TaskRecord to the plain dict the engine stores."""
+        # model_dump(mode='json') ensures datetimes are serialized to ISO strings
+        return record.model_dump(mode='json')
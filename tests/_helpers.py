@@ -0,0 +1,26 @@
+"""Shared helpers for building test data and reading responses."""
+from datetime import datetime
+from typing import Any
+
+import orjson
+
+from app.models import TaskRecord
+
+# Fixed timestamp used for every sample record, keeps the tests deterministic
+NOW = datetime(2025, 1, 1)
+
+
+def make_record(**fields) -> TaskRecord:
+    """
+    Build a TaskRecord without running validation, the test data is known to be valid.
+    createdAt and isCompleted get defaults, so only the interesting fields need passing.
+    Use the TaskRecord constructor directly when a test is about validation itself.
+    """
+    fields.setdefault("createdAt", NOW)
+    fields.setdefault("isCompleted", False)
+    return TaskRecord.model_construct(**fields)
+
+
+def json_body(response) -> Any:
+    """Parse a response body with orjson, the same library the app encodes it with."""
+    return orjson.loads(response.content)
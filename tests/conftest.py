@@ -0,0 +1,82 @@
+import atexit
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from pytest_asyncio import is_async_test
+from httpx import ASGITransport, AsyncClient
+
+# The client below runs the app lifespan, which loads the app's own database.
+# Point it at a throwaway file before app.config is imported, so tests never touch data/database.json.
+# Every process that creates one (including each xdist worker) removes it again on exit.
+if not os.environ.get("SODOT_DB_PATH"):
+    _db_dir = tempfile.mkdtemp(prefix="sodot-tests-")
+    atexit.register(shutil.rmtree, _db_dir, ignore_errors=True)
+    os.environ["SODOT_DB_PATH"] = str(Path(_db_dir) / "database.json")
+
+from app.main import app
+from tests._helpers import NOW
+
+
+class _FrozenDatetime(datetime):
+    """datetime whose now() always returns NOW."""
+
+    @classmethod
+    def now(cls, tz=None):
+        return NOW
+
+
+@pytest.fixture(scope="session", autouse=True)
+def frozen_time():
+    """
+    Pins the clock the service stamps createdAt with, so created records are reproducible.
+    Only the service module's datetime is swapped, everything else keeps the real one.
+    Session-scoped, so it is already in place for class- and module-scoped fixtures.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("app.services.tasks.datetime", _FrozenDatetime)
+        yield
+
+
+def pytest_collection_modifyitems(items):
+    """
+    Runs every async test in one event loop for the whole session, instead of a new loop per test.
+    The matching default for async fixtures is set in pytest.ini.
+    """
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
+@pytest_asyncio.fixture(scope="session")
+async def client():
+    """
+    One async HTTP client for the whole test session, calling the app directly
+    in the shared event loop, with no server thread in between.
+    ASGITransport does not send lifespan events, so the app's startup/shutdown is run around it here, exactly once.
+    """
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+            yield c
+
+
+@pytest.fixture
+def override():
+    """
+    Overrides an app dependency for one test: `override(get_service, fake)`.
+    Afterwards only the overrides it added are popped, the dict itself stays the same object.
+    """
+    added = []
+
+    def _override(dependency, value):
+        app.dependency_overrides[dependency] = lambda: value
+        added.append(dependency)
+
+    yield _override
+    for dependency in added:
+        app.dependency_overrides.pop(dependency, None)
@@ -0,0 +1,101 @@
+"""
+Lightweight stand-ins for the app's layers, used instead of MagicMock in unit tests.
+
+Every call is recorded in `calls` as a (method_name, *args) tuple, and the
+value a method returns can be set in `returns`, keyed by method name.
+"""
+from typing import Any, Dict, List, Tuple
+
+
+class _Recorder:
+    def __init__(self):
+        self.calls: List[Tuple] = []
+        self.returns: Dict[str, Any] = {}
+
+    def count(self, name: str) -> int:
+        """How many times the method `name` was called."""
+        return sum(1 for call in self.calls if call[0] == name)
+
+    def _call(self, name: str, *args, default: Any = None) -> Any:
+        self.calls.append((name, *args))
+        return self.returns.get(name, default)
+
+
+class FakeRepo(_Recorder):
+    """Stand-in for TaskRepository. save() echoes the record back unless told otherwise."""
+
+    async def get_all(self):
+        return self._call("get_all", default=[])
+
+    async def get_by_id(self, task_id):
+        return self._call("get_by_id", task_id)
+
+    async def save(self, record):
+        return self._call("save", record, default=record)
+
+    async def update(self, task_id, changes):
+        return self._call("update", task_id, changes)
+
+    async def delete(self, task_id):
+        return self._call("delete", task_id, default=False)
+
+
+class FakeService(_Recorder):
+    """Stand-in for TaskService."""
+
+    async def list_tasks(self):
+        return self._call("list_tasks", default=[])
+
+    async def create_task(self, task_create):
+        return self._call("create_task", task_create)
+
+    async def get_task(self, task_id):
+        return self._call("get_task", task_id)
+
+    async def update_task(self, task_id, update_data):
+        return self._call("update_task", task_id, update_data)
+
+    async def delete_task(self, task_id):
+        return self._call("delete_task", task_id, default=False)
+
+
+class InMemoryStorageEngine(_Recorder):
+    """
+    Stand-in for JsonStorageEngine that keeps the data in a dict, with no disk I/O.
+    Answers come from `data` (seed it directly), calls are still recorded in `calls`.
+    """
+
+    def __init__(self, data=None):
+        super().__init__()
+        self.data = dict(data or {})
+
+    async def load(self):
+        self.calls.append(("load",))
+
+    async def read(self):
+        self.calls.append(("read",))
+        return self.data
+
+    async def write(self, data):
+        self.calls.append(("write", data))
+        self.data = data
+
+    async def get(self, key):
+        self.calls.append(("get", key))
+        return self.data.get(key)
+
+    async def put(self, key, item):
+        self.calls.append(("put", key, item))
+        self.data[key] = item
+
+    async def put_many(self, items):
+        self.calls.append(("put_many", items))
+        self.data.update(items)
+
+    async def remove(self, key):
+        self.calls.append(("remove", key))
+        return self.data.pop(key, None) is not None
+
+    async def remove_many(self, keys):
+        self.calls.append(("remove_many", keys))
+        return sum(self.data.pop(key, None) is not None for key in dict.fromkeys(keys))
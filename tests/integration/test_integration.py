@@ -1,112 +1,174 @@
+from datetime import date
+from types import SimpleNamespace
+
 import pytest
-from fastapi.testclient import TestClient
+import pytest_asyncio
 from app.main import app
 from app.dependencies import get_repository
+from app.models import TaskCreate, TaskUpdate
 from app.storage.engine import JsonStorageEngine
 from app.storage.repository import TaskRepository
+from tests.fakes import InMemoryStorageEngine
+from tests._helpers import json_body
 
-# Use TestClient as a context manager to handle startup/shutdown events if any
-client = TestClient(app)
+# --- Request Bodies ---
+# Serialized once for the module from date objects, and sent as-is with content= instead of json=.
+JSON_HEADERS = {"content-type": "application/json"}
+NEW_TASK_JSON = TaskCreate.model_construct(
+    title="Integration Task",
+    description="Testing the whole stack",
+    dueDate=date(2025, 12, 31)
+).model_dump_json(exclude_unset=True)
+PATCH_JSON = TaskUpdate.model_construct(title="Updated Title", isCompleted=True).model_dump_json(exclude_unset=True)
 
 @pytest.fixture
-def temporary_repo(tmp_path):
+def temporary_repo():
     """
-    Creates a real Repository and Engine, but points them to a 
-    temporary file in the pytest temp directory.
+    Creates a real Repository on top of an in-memory engine,
+    so the full stack runs without any disk I/O.
+    The real JSON engine is covered by the slow test at the bottom of this file.
     """
-    # tmp_path is a built-in pytest fixture that creates a unique folder per test
-    temp_db_file = tmp_path / "test_integration_db.json"
-    
-    # Initialize the real engine with the temp path
-    engine = JsonStorageEngine(db_path=temp_db_file)
-    
-    # Initialize the real repository
-    return TaskRepository(db=engine)
+    return TaskRepository(db=InMemoryStorageEngine())
 
 @pytest.fixture(autouse=True)
-def override_dependency(temporary_repo):
+def override_dependency(override, temporary_repo):
     """
     Overrides the app's dependency to use our temporary repository.
-    This ensures API calls hit our temp file, not the real 'data/database.json'.
+    This ensures API calls hit our temporary storage, not the real 'data/database.json'.
     """
-    app.dependency_overrides[get_repository] = lambda: temporary_repo
-    yield
-    # Cleanup overrides after test
-    app.dependency_overrides = {}
+    override(get_repository, temporary_repo)
 
-def test_full_task_lifecycle():
+class TestTaskLifecycle:
     """
     Scenario: User creates a task, reads it, updates it, and deletes it.
     Verifies the entire data flow works.
+    The scenario runs once for the class, each test checks one step of it.
     """
-    # 1. Create
-    payload = {
-        "title": "Integration Task",
-        "description": "Testing the whole stack",
-        "dueDate": "2025-12-31"
-    }
-    response = client.post("/todos/", json=payload)
-    assert response.status_code == 201
-    data = response.json()
-    task_id = data["id"]
-    
-    assert data["title"] == "Integration Task"
-    assert data["isCompleted"] is False
-
-    # 2. Get (Read)
-    get_response = client.get(f"/todos/{task_id}")
-    assert get_response.status_code == 200
-    assert get_response.json()["id"] == task_id
-
-    # 3. Update (Patch)
-    update_payload = {"title": "Updated Title", "isCompleted": True}
-    patch_response = client.patch(f"/todos/{task_id}", json=update_payload)
-    assert patch_response.status_code == 200
-    assert patch_response.json()["title"] == "Updated Title"
-    assert patch_response.json()["isCompleted"] is True
-
-    # 4. Verify Update Persisted
-    get_response_2 = client.get(f"/todos/{task_id}")
-    assert get_response_2.json()["title"] == "Updated Title"
-
-    # 5. Delete
-    delete_response = client.delete(f"/todos/{task_id}")
-    assert delete_response.status_code == 204
-
-    # 6. Verify Gone
-    get_response_3 = client.get(f"/todos/{task_id}")
-    assert get_response_3.status_code == 404
-
-def test_specific_actions_workflow():
+
+    @pytest_asyncio.fixture(scope="class")
+    async def lifecycle(self, client):
+        """
+        Runs the whole scenario against its own in-memory repository and keeps every response.
+        The function-scoped override fixtures don't exist yet at class scope,
+        so it sets and removes its own override.
+        """
+        repo = TaskRepository(db=InMemoryStorageEngine())
+        app.dependency_overrides[get_repository] = lambda: repo
+        try:
+            # 1. Create
+            created = await client.post("/todos/", content=NEW_TASK_JSON, headers=JSON_HEADERS)
+            task_id = json_body(created)["id"]
+
+            # 2. Get (Read)
+            fetched = await client.get(f"/todos/{task_id}")
+
+            # 3. Update (Patch)
+            patched = await client.patch(f"/todos/{task_id}", content=PATCH_JSON, headers=JSON_HEADERS)
+
+            # 4. Verify Update Persisted
+            refetched = await client.get(f"/todos/{task_id}")
+
+            # 5. Delete
+            deleted = await client.delete(f"/todos/{task_id}")
+
+            # 6. Verify Gone
+            gone = await client.get(f"/todos/{task_id}")
+        finally:
+            app.dependency_overrides.pop(get_repository, None)
+
+        return SimpleNamespace(
+            task_id=task_id, created=created, fetched=fetched, patched=patched,
+            refetched=refetched, deleted=deleted, gone=gone
+        )
+
+    def test_create_returns_new_task(self, lifecycle):
+        assert lifecycle.created.status_code == 201
+        data = json_body(lifecycle.created)
+        assert data["title"] == "Integration Task"
+        assert data["isCompleted"] is False
+        assert data["createdAt"] == "2025-01-01T00:00:00"
+
+    def test_get_returns_created_task(self, lifecycle):
+        assert lifecycle.fetched.status_code == 200
+        assert json_body(lifecycle.fetched)["id"] == lifecycle.task_id
+
+    def test_patch_applies_changes(self, lifecycle):
+        assert lifecycle.patched.status_code == 200
+        assert json_body(lifecycle.patched)["title"] == "Updated Title"
+        assert json_body(lifecycle.patched)["isCompleted"] is True
+
+    def test_patch_is_persisted(self, lifecycle):
+        assert json_body(lifecycle.refetched)["title"] == "Updated Title"
+
+    def test_delete_removes_task(self, lifecycle):
+        assert lifecycle.deleted.status_code == 204
+        assert lifecycle.gone.status_code == 404
+
+async def test_specific_actions_workflow(client):
     """
     Scenario: User completes and incompletes a task using specific endpoints.
     """
     # Create
-    response = client.post("/todos/", json={"title": "Action Test"})
-    task_id = response.json()["id"]
+    response = await client.post("/todos/", json={"title": "Action Test"})
+    task_id = json_body(response)["id"]
 
     # Mark Complete
-    complete_response = client.post(f"/todos/{task_id}/complete")
+    complete_response = await client.post(f"/todos/{task_id}/complete")
     assert complete_response.status_code == 200
-    assert complete_response.json()["isCompleted"] is True
+    assert json_body(complete_response)["isCompleted"] is True
 
     # Mark Incomplete
-    incomplete_response = client.post(f"/todos/{task_id}/incomplete")
+    incomplete_response = await client.post(f"/todos/{task_id}/incomplete")
     assert incomplete_response.status_code == 200
-    assert incomplete_response.json()["isCompleted"] is False
+    assert json_body(incomplete_response)["isCompleted"] is False
 
-def test_error_handling_real_stack():
+@pytest.mark.parametrize("method, body", [
+    ("GET", None),
+    ("DELETE", None),
+    ("PATCH", {"title": "New"}),
+], ids=["get", "delete", "update"])
+async def test_error_handling_real_stack(client, method, body):
     """
     Scenario: Operations on non-existent IDs.
     """
-    # Get Missing
-    response = client.get("/todos/missing-id-123")
+    response = await client.request(method, "/todos/missing-id-123", json=body)
     assert response.status_code == 404
-    
-    # Delete Missing
-    response = client.delete("/todos/missing-id-123")
+
+@pytest.mark.slow
+async def test_lifecycle_persists_to_disk(client, override, tmp_path):
+    """
+    Scenario: Same stack, but on the real JSON file engine.
+    Verifies that changes made over HTTP survive reloading the file.
+    """
+    # tmp_path is a built-in pytest fixture that creates a unique folder per test
+    temp_db_file = tmp_path / "test_integration_db.json"
+    disk_repo = TaskRepository(db=JsonStorageEngine(db_path=temp_db_file))
+    override(get_repository, disk_repo)
+
+    kept_id = json_body(await client.post("/todos/", json={"title": "Keep me", "dueDate": "2025-12-31"}))["id"]
+    gone_id = json_body(await client.post("/todos/", json={"title": "Delete me"}))["id"]
+    assert (await client.patch(f"/todos/{kept_id}", json={"title": "Kept"})).status_code == 200
+    assert (await client.delete(f"/todos/{gone_id}")).status_code == 204
+
+    # A fresh engine rebuilds its state from the file alone
+    reloaded = await TaskRepository(db=JsonStorageEngine(db_path=temp_db_file)).get_all()
+    assert [(task.id, task.title) for task in reloaded] == [(kept_id, "Kept")]
+
+@pytest.mark.slow
+@pytest.mark.parametrize("warm", [True, False], ids=["warm", "cold"])
+async def test_delete_missing_writes_nothing(client, override, tmp_path, warm):
+    """
+    Scenario: Deleting an ID that was never stored, on the real JSON file engine.
+    The engine checks its in-memory state first, so a miss is answered without appending to the log.
+    A cold engine still has to load the file once to know the ID is absent.
+    """
+    engine = JsonStorageEngine(db_path=tmp_path / "test_integration_db.json")
+    if warm:
+        await engine.load()
+    override(get_repository, TaskRepository(db=engine))
+
+    response = await client.delete("/todos/missing-id-123")
+
     assert response.status_code == 404
-    
-    # Update Missing
-    response = client.patch("/todos/missing-id-123", json={"title": "New"})
-    assert response.status_code == 404
\ No newline at end of file
+    assert engine.db_path.exists()
+    assert not engine.log_path.exists()
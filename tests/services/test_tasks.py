@@ -1,36 +1,41 @@
 import pytest
-from unittest.mock import AsyncMock, MagicMock
 from datetime import date, datetime
 
 from app.services.tasks import TaskService
-from app.storage.repository import TaskRepository
 from app.models import TaskCreate, TaskUpdate, TaskRecord
+from tests.fakes import FakeRepo
+from tests._helpers import NOW, make_record
+
+# --- Sample Payloads ---
+# Built once for the module, without validation, the same way make_record builds records.
+# model_construct still tracks which fields were passed, so exclude_unset behaves as in the API.
+CREATE_PAYLOAD = TaskCreate.model_construct(title="Buy Milk", description="2%", dueDate=date(2025, 1, 1))
+PATCH_TITLE = TaskUpdate.model_construct(title="New Title")
+PATCH_DATE_AND_STATUS = TaskUpdate.model_construct(dueDate=date(2025, 6, 1), isCompleted=True)
+
+# Creation time of the sample record
+CREATED_AT = datetime(2024, 1, 1, 0, 0, 0)
 
 class TestTaskService:
     """Unit tests for the Business Logic Layer."""
 
     @pytest.fixture
     def mock_repo(self):
-        repo = MagicMock(spec=TaskRepository)
-        repo.get_all = AsyncMock()
-        repo.get_by_id = AsyncMock()
-        repo.save = AsyncMock()
-        repo.delete = AsyncMock()
-        return repo
+        return FakeRepo()
 
     @pytest.fixture
     def service(self, mock_repo):
         return TaskService(repo=mock_repo)
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def sample_record(self):
-        return TaskRecord(
+        return make_record(
             id="task-1",
             title="Old Title",
             description="Old Desc",
             dueDate=date(2024, 1, 1),
             isCompleted=False,
-            createdAt=datetime(2024, 1, 1, 0, 0, 0)
+            createdAt=CREATED_AT
         )
 
     # --- Test Creation Logic ---
@@ -42,15 +47,7 @@ class TestTaskService:
         1. A UUID (id)
         2. A Timestamp (createdAt)
         """
-        input_data = TaskCreate(
-            title="Buy Milk", 
-            description="2%", 
-            dueDate=date(2025, 1, 1)
-        )
-
-        mock_repo.save.side_effect = lambda record: record
-
-        result = await service.create_task(input_data)
+        result = await service.create_task(CREATE_PAYLOAD)
 
         assert isinstance(result, TaskRecord)
         assert result.title == "Buy Milk"
@@ -59,68 +56,66 @@ class TestTaskService:
         assert isinstance(result.id, str)
         assert len(result.id) > 0  # Likely a UUID
         
-        assert result.createdAt is not None
-        assert isinstance(result.createdAt, datetime)
+        # The clock is frozen by the frozen_time fixture in conftest.py
+        assert result.createdAt == NOW
 
-        mock_repo.save.assert_called_once()
+        assert mock_repo.count("save") == 1
 
     # --- Test Update Logic ---
 
     @pytest.mark.asyncio
-    async def test_update_task_merges_partial_fields(self, service, mock_repo, sample_record):
+    async def test_update_task_passes_only_set_fields(self, service, mock_repo, sample_record):
         """
-        Verifies that the Service layer correctly merges new fields
-        into the existing record without overwriting others with None.
+        Verifies that the Service layer hands the repository only the fields
+        the client sent, so the others are not overwritten with None.
         """
-        mock_repo.get_by_id.return_value = sample_record
-        mock_repo.save.side_effect = lambda record: record
+        mock_repo.returns["update"] = sample_record.model_copy(update={"title": "New Title"})
 
         # Input: Partial update (only title changes)
-        update_payload = TaskUpdate(title="New Title")
-
-        result = await service.update_task("task-1", update_payload)
+        result = await service.update_task("task-1", PATCH_TITLE)
 
         assert result.id == "task-1"
-        assert result.title == "New Title"       # CHANGED
-        assert result.description == "Old Desc"  # PRESERVED
-        assert result.isCompleted is False       # PRESERVED
-        assert result.createdAt == sample_record.createdAt # PRESERVED
+        assert result.title == "New Title"
+
+        # Verify repo was asked to change the title, and nothing else
+        assert mock_repo.calls == [("update", "task-1", {"title": "New Title"})]
+        assert mock_repo.count("save") == 0
+
+    @pytest.mark.asyncio
+    async def test_update_task_serializes_dates(self, service, mock_repo):
+        """Verifies the changes are passed in the same JSON form the DB stores."""
+        await service.update_task("task-1", PATCH_DATE_AND_STATUS)
 
-        # Verify repo saved the merged object
-        mock_repo.save.assert_called_once()
-        saved_record = mock_repo.save.call_args[0][0]
-        assert saved_record.title == "New Title"
-        assert saved_record.description == "Old Desc"
+        assert mock_repo.calls == [("update", "task-1", {"dueDate": "2025-06-01", "isCompleted": True})]
 
     @pytest.mark.asyncio
     async def test_update_task_returns_none_if_missing(self, service, mock_repo):
         """Verifies correct handling of non-existent IDs."""
-        mock_repo.get_by_id.return_value = None
+        mock_repo.returns["update"] = None
 
-        result = await service.update_task("ghost-id", TaskUpdate(title="Boo"))
+        result = await service.update_task("ghost-id", PATCH_TITLE)
 
         assert result is None
-        mock_repo.save.assert_not_called()
 
     # --- Test Pass-Throughs (Simple delegation) ---
 
     @pytest.mark.asyncio
     async def test_list_tasks_delegates_to_repo(self, service, mock_repo):
-        mock_repo.get_all.return_value = ["fake-list"]
+        mock_repo.returns["get_all"] = ["fake-list"]
         result = await service.list_tasks()
         assert result == ["fake-list"]
-        mock_repo.get_all.assert_called_once()
+        assert mock_repo.count("get_all") == 1
 
     @pytest.mark.asyncio
     async def test_get_task_delegates_to_repo(self, service, mock_repo):
-        mock_repo.get_by_id.return_value = "fake-record"
+        mock_repo.returns["get_by_id"] = "fake-record"
         result = await service.get_task("123")
         assert result == "fake-record"
-        mock_repo.get_by_id.assert_called_with("123")
+        assert mock_repo.calls[-1] == ("get_by_id", "123")
 
     @pytest.mark.asyncio
     async def test_delete_task_delegates_to_repo(self, service, mock_repo):
-        mock_repo.delete.return_value = True
+        mock_repo.returns["delete"] = True
         result = await service.delete_task("123")
         assert result is True
-        mock_repo.delete.assert_called_with("123")
\ No newline at end of file
+        assert mock_repo.calls[-1] == ("delete", "123")
\ No newline at end of file
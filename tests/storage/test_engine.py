@@ -0,0 +1,229 @@
+import asyncio
+import errno
+import threading
+
+import pytest
+
+from app.storage.engine import JsonStorageEngine
+
+class TestJsonStorageEngine:
+    """Tests for the snapshot + append-only log engine, on real files under tmp_path."""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        return tmp_path / "database.json"
+
+    @pytest.fixture
+    def engine(self, db_path):
+        return JsonStorageEngine(db_path=db_path)
+
+    @staticmethod
+    async def reload(db_path):
+        """What a fresh engine (e.g. after a restart) rebuilds from the files alone."""
+        return await JsonStorageEngine(db_path=db_path).read()
+
+    @staticmethod
+    def log_lines(engine):
+        return engine.log_path.read_bytes().splitlines() if engine.log_path.exists() else []
+
+    # --- Test Log And Compaction ---
+
+    @pytest.mark.asyncio
+    async def test_mutations_are_appended_to_the_log(self, engine, db_path):
+        await engine.put("a", {"title": "A"})
+        await engine.put("b", {"title": "B"})
+        assert await engine.remove("a") is True
+        assert await engine.remove("a") is False  # A miss logs nothing
+
+        assert len(self.log_lines(engine)) == 3
+        assert await self.reload(db_path) == {"b": {"title": "B"}}
+
+    @pytest.mark.asyncio
+    async def test_reload_matches_after_compaction(self, engine, db_path):
+        engine.COMPACT_THRESHOLD = 10
+        for i in range(25):
+            await engine.put(f"task-{i}", {"n": i})
+        for i in range(0, 25, 3):
+            await engine.remove(f"task-{i}")
+
+        # 34 operations with a threshold of 10: several compactions ran, only the tail is still in the log
+        assert len(self.log_lines(engine)) <= engine.COMPACT_THRESHOLD
+        reloaded = await self.reload(db_path)
+        assert reloaded == await engine.read()
+        assert list(reloaded) == list(await engine.read())  # Insertion order survives snapshot + replay
+
+    @pytest.mark.asyncio
+    async def test_write_replaces_everything_with_a_snapshot(self, engine, db_path):
+        await engine.put("old", {})
+
+        await engine.write({"new": {"title": "New"}})
+
+        assert not engine.log_path.exists()
+        assert await self.reload(db_path) == {"new": {"title": "New"}}
+
+    # --- Test Recovery ---
+
+    @pytest.mark.asyncio
+    async def test_torn_tail_is_dropped_and_later_writes_survive(self, engine, db_path):
+        await engine.put("a", {})
+        await engine.put("b", {})
+        # An append interrupted halfway through, e.g. by a crash
+        with open(engine.log_path, "ab") as f:
+            f.write(b'{"op":"put","id":"c","rec')
+
+        restarted = JsonStorageEngine(db_path=db_path)
+        assert list(await restarted.read()) == ["a", "b"]
+        await restarted.put("d", {})
+        await restarted.put("e", {})
+
+        assert list(await self.reload(db_path)) == ["a", "b", "d", "e"]
+
+    @pytest.mark.asyncio
+    async def test_corrupt_line_before_the_end_raises(self, engine, db_path):
+        await engine.put("a", {})
+        await engine.put("b", {})
+        log = engine.log_path.read_bytes()
+        engine.log_path.write_bytes(b"garbage" + log[7:])
+
+        with pytest.raises(ValueError, match="Corrupt entry"):
+            await self.reload(db_path)
+
+    # --- Test Failed Appends ---
+
+    @pytest.mark.asyncio
+    async def test_failed_append_leaves_state_unchanged(self, engine, db_path, monkeypatch):
+        await engine.put("a", {"v": 1})
+
+        def disk_full(lines):
+            raise OSError(errno.ENOSPC, "No space left on device")
+        monkeypatch.setattr(engine, "_append_to_log", disk_full)
+
+        with pytest.raises(OSError):
+            await engine.put("a", {"v": 2})
+        with pytest.raises(OSError):
+            await engine.put("b", {"v": 2})
+
+        assert await engine.read() == {"a": {"v": 1}}
+        assert await self.reload(db_path) == {"a": {"v": 1}}
+
+    @pytest.mark.asyncio
+    async def test_failed_compaction_does_not_fail_the_writers(self, engine, db_path, monkeypatch):
+        engine.COMPACT_THRESHOLD = 2
+        await engine.load()
+        save = engine._save_to_disk
+
+        def disk_full(data, path=None):
+            with open(path, "wb") as f:
+                f.write(b'{"partial')
+            raise OSError(errno.ENOSPC, "No space left on device")
+        monkeypatch.setattr(engine, "_save_to_disk", disk_full)
+
+        for key in "abcd":
+            await engine.put(key, {})  # Compaction fails after "c", the write itself succeeded
+
+        assert not engine.db_path.with_name(engine.db_path.name + ".tmp").exists()
+        assert list(await self.reload(db_path)) == ["a", "b", "c", "d"]
+
+        monkeypatch.setattr(engine, "_save_to_disk", save)
+        for key in "efg":
+            await engine.put(key, {})
+
+        # Retried after another COMPACT_THRESHOLD operations
+        assert len(self.log_lines(engine)) <= engine.COMPACT_THRESHOLD
+        assert list(await self.reload(db_path)) == list("abcdefg")
+
+    @pytest.mark.asyncio
+    async def test_cancelled_thread_append_is_settled_by_its_outcome(self, engine, db_path, monkeypatch):
+        await engine.load()
+        started, release = threading.Event(), threading.Event()
+        append = engine._append_to_log
+
+        def blocking_append(lines):
+            started.set()
+            release.wait(5)
+            append(lines)
+        monkeypatch.setattr(engine, "_append_to_log", blocking_append)
+
+        writer = asyncio.create_task(engine.put("a", {}))
+        await asyncio.to_thread(started.wait, 5)
+        writer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await writer
+        # Not on disk yet, so not visible yet
+        assert await engine.read() == {}
+
+        release.set()
+        monkeypatch.setattr(engine, "_append_to_log", append)
+        await engine.put("b", {})  # Waits for the cancelled append to land first
+
+        assert list(await engine.read()) == ["a", "b"]
+        assert list(await self.reload(db_path)) == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_compaction_finishes_before_later_appends(self, engine, db_path, monkeypatch):
+        engine.COMPACT_THRESHOLD = 2
+        await engine.put("a", {})
+        await engine.put("b", {})
+        started, release = threading.Event(), threading.Event()
+        fsync_dir = engine._fsync_dir
+
+        def blocking_fsync_dir():
+            # The snapshot is already saved, only the log unlink is still to come
+            started.set()
+            release.wait(5)
+            fsync_dir()
+        monkeypatch.setattr(engine, "_fsync_dir", blocking_fsync_dir)
+
+        writer = asyncio.create_task(engine.put("c", {}))
+        await asyncio.to_thread(started.wait, 5)
+        writer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await writer
+
+        engine.COMPACT_THRESHOLD = 100
+        later = asyncio.gather(engine.put("d", {}), engine.put("e", {}))
+        await asyncio.sleep(0.05)
+        assert not later.done()  # Held back until the compaction has unlinked the old log
+
+        release.set()
+        await later
+
+        assert list(await self.reload(db_path)) == ["a", "b", "c", "d", "e"]
+
+    # --- Test Batches ---
+
+    @pytest.mark.asyncio
+    async def test_put_many_and_remove_many_round_trip(self, engine, db_path):
+        await engine.put_many({f"task-{i}": {"n": i} for i in range(5)})
+        assert len(self.log_lines(engine)) == 5
+
+        removed = await engine.remove_many(["task-1", "task-3", "task-3", "missing-id"])
+
+        assert removed == 2
+        assert list(await self.reload(db_path)) == ["task-0", "task-2", "task-4"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_removes_of_one_key_hit_once(self, engine, db_path):
+        await engine.put_many({"a": {}, "b": {}})
+
+        results = await asyncio.gather(
+            engine.remove("a"), engine.remove("a"), engine.remove_many(["a", "b"]), engine.remove_many(["b"])
+        )
+
+        assert results == [True, False, 1, 0]
+        assert self.log_lines(engine)[2:] == [b'{"op":"delete","id":"a"}', b'{"op":"delete","id":"b"}']
+        assert await self.reload(db_path) == {}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writers_share_appends(self, engine, db_path, monkeypatch):
+        await engine.load()
+        appends = []
+        append = engine._append_to_log
+        monkeypatch.setattr(engine, "_append_to_log", lambda lines: (appends.append(lines), append(lines)))
+
+        await asyncio.gather(*(engine.put(f"task-{i}", {"n": i}) for i in range(200)))
+
+        # Group commit: everyone queued in the same loop turn lands in one write
+        assert len(appends) == 1
+        assert len(self.log_lines(engine)) == 200
+        assert await self.reload(db_path) == await engine.read()
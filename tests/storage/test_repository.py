@@ -1,41 +1,64 @@
+import time
+
 import pytest
-from unittest.mock import AsyncMock, MagicMock
-from datetime import datetime
+from pydantic import ValidationError
+from datetime import date, datetime
 
 from app.storage.repository import TaskRepository
 from app.models import TaskRecord
 from app.storage.engine import JsonStorageEngine
+from tests.fakes import InMemoryStorageEngine
+from tests._helpers import make_record
+
+# Creation time of the sample record, built once for the module
+CREATED_AT = datetime(2024, 1, 1, 0, 0, 0)
 
 class TestTaskRepository:
 
     @pytest.fixture
     def mock_engine(self):
-        """Create a mock JsonStorageEngine."""
-        engine = MagicMock(spec=JsonStorageEngine)
-        engine.read = AsyncMock()
-        engine.write = AsyncMock()
-        return engine
+        """
+        Create a fake JsonStorageEngine.
+        It starts empty, tests seed `data` directly, and every call is recorded.
+        """
+        return InMemoryStorageEngine()
+
+    @pytest.fixture
+    def disk_engine(self, tmp_path):
+        """A real JsonStorageEngine on a temporary file, for the tests about what actually ends up on disk."""
+        return JsonStorageEngine(db_path=tmp_path / "database.json")
 
     @pytest.fixture
     def repository(self, mock_engine):
         """Create a TaskRepository instance injected with the mock engine."""
         return TaskRepository(mock_engine)
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def sample_record(self):
         """A valid domain record."""
-        return TaskRecord(
+        return make_record(
             id="task-1",
             title="Test Task",
             description="Test Description",
-            dueDate="2024-12-31",
+            dueDate=date(2024, 12, 31),
             isCompleted=False,
-            createdAt=datetime(2024, 1, 1, 0, 0, 0)
+            createdAt=CREATED_AT
         )
 
-    @pytest.fixture
-    def sample_json_data(self, sample_record):
-        """What that record looks like inside the JSON file (serialized)."""
+    @pytest.fixture(scope="class")
+    def record_pool(self, sample_record):
+        """
+        1000 distinct records (task-0 ... task-999), built once for the class.
+        Tests only read them, a test that needs a changed record takes a model_copy.
+        """
+        return [sample_record.model_copy(update={"id": f"task-{i}", "title": f"Task {i}"}) for i in range(1000)]
+
+    @pytest.fixture(scope="class")
+    def sample_json_data(self):
+        """
+        What that record looks like inside the JSON file (serialized).
+        Shared by the whole class, so tests must not modify it: variants are built as {**sample_json_data, ...} copies.
+        """
         return {
             "id": "task-1",
             "title": "Test Task",
@@ -47,40 +70,56 @@ class TestTaskRepository:
 
     # --- Test Save ---
 
+    @pytest.mark.parametrize("existing", [False, True], ids=["new", "overwrite"])
     @pytest.mark.asyncio
-    async def test_save_persists_record(self, repository, mock_engine, sample_record):
-        """Test that save() writes the record to the engine."""
-        mock_engine.read.return_value = {}
+    async def test_save_persists_record(self, repository, mock_engine, sample_record, sample_json_data, existing):
+        """Test that save() puts the single record into the engine, replacing a stored one with the same ID."""
+        if existing:
+            mock_engine.data["task-1"] = {**sample_json_data, "title": "Old Title"}
         
         result = await repository.save(sample_record)
         
         assert result == sample_record
-        mock_engine.write.assert_called_once()
+        assert mock_engine.count("put") == 1
+        assert mock_engine.count("write") == 0
+        
+        # Verify persistence format, and that the ID still maps to exactly one item
+        assert mock_engine.data == {"task-1": sample_json_data}
+
+    @pytest.mark.asyncio
+    async def test_save_journal_is_append_only(self, disk_engine, record_pool):
+        """Test that each save appends one line to the engine's log and leaves the snapshot file alone."""
+        repository = TaskRepository(disk_engine)
+        await disk_engine.load()
+        snapshot = disk_engine.db_path.read_bytes()
+        
+        for i, record in enumerate(record_pool[:100], start=1):
+            await repository.save(record)
+            assert len(disk_engine.log_path.read_bytes().splitlines()) == i
         
-        # Verify persistence format
-        saved_data = mock_engine.write.call_args[0][0]
-        assert "task-1" in saved_data
-        assert saved_data["task-1"]["title"] == "Test Task"
-        assert saved_data["task-1"]["id"] == "task-1"
+        assert disk_engine.db_path.read_bytes() == snapshot
 
     @pytest.mark.asyncio
-    async def test_save_overwrites_existing(self, repository, mock_engine, sample_record, sample_json_data):
-        """Test that save() overwrites an existing ID."""
-        mock_engine.read.return_value = {"task-1": sample_json_data}
+    async def test_save_many_puts_all_records_at_once(self, repository, mock_engine, record_pool):
+        """Test that save_many() hands every record to the engine in a single call."""
+        records = record_pool[:100]
         
-        updated_record = sample_record.model_copy(update={"title": "New Title"})
+        result = await repository.save_many(records)
         
-        await repository.save(updated_record)
+        assert result == records
+        assert mock_engine.count("put_many") == 1
+        assert mock_engine.count("put") == 0
         
-        saved_data = mock_engine.write.call_args[0][0]
-        assert saved_data["task-1"]["title"] == "New Title"
+        assert list(mock_engine.data) == [f"task-{i}" for i in range(100)]
+        assert mock_engine.data["task-42"]["id"] == "task-42"
+        assert mock_engine.data["task-42"]["dueDate"] == "2024-12-31"
 
     # --- Test Read ---
 
     @pytest.mark.asyncio
     async def test_get_all_returns_records(self, repository, mock_engine, sample_json_data):
         """Test fetching all tasks converts dicts to TaskRecords."""
-        mock_engine.read.return_value = {
+        mock_engine.data = {
             "task-1": sample_json_data,
             "task-2": {**sample_json_data, "id": "task-2", "title": "Second Task"}
         }
@@ -91,46 +130,154 @@ class TestTaskRepository:
         assert isinstance(result[0], TaskRecord)
         assert result[0].id == "task-1"
         assert result[1].title == "Second Task"
+        # Dates are converted back from their stored ISO strings
+        assert result[0].dueDate == date(2024, 12, 31)
+        assert result[0].createdAt == CREATED_AT
+
+    @pytest.mark.asyncio
+    async def test_get_all_returns_many_records(self, repository, record_pool):
+        """Test a larger dataset comes back complete, in order, and as fully typed TaskRecords."""
+        await repository.save_many(record_pool)
+        
+        result = await repository.get_all()
+        
+        assert result == record_pool
+        assert all(isinstance(task, TaskRecord) for task in result)
+        assert isinstance(result[-1].createdAt, datetime)
+        assert result[-1].dueDate == date(2024, 12, 31)
 
     @pytest.mark.asyncio
     async def test_get_by_id_found(self, repository, mock_engine, sample_json_data):
-        mock_engine.read.return_value = {"task-1": sample_json_data}
+        mock_engine.data["task-1"] = sample_json_data
         
         result = await repository.get_by_id("task-1")
         
+        # A single keyed lookup, the full dataset is never read
+        assert mock_engine.calls == [("get", "task-1")]
         assert isinstance(result, TaskRecord)
         assert result.title == "Test Task"
         assert result.id == "task-1"
 
     @pytest.mark.asyncio
     async def test_get_by_id_not_found(self, repository, mock_engine):
-        mock_engine.read.return_value = {}
         result = await repository.get_by_id("missing-id")
         assert result is None
 
+    # --- Test Update ---
+
+    @pytest.mark.asyncio
+    async def test_update_merges_changes(self, repository, mock_engine, sample_json_data):
+        """Test that update() merges the changes into the stored dict and puts it back."""
+        mock_engine.data["task-1"] = sample_json_data
+        
+        result = await repository.update("task-1", {"title": "New Title", "isCompleted": True})
+        
+        assert isinstance(result, TaskRecord)
+        assert result.title == "New Title"
+        assert result.isCompleted is True
+        assert result.description == "Test Description"  # PRESERVED
+        assert result.createdAt == CREATED_AT  # PRESERVED
+        
+        assert mock_engine.data["task-1"] == {**sample_json_data, "title": "New Title", "isCompleted": True}
+        # The stored dict itself is not modified in place
+        assert sample_json_data["title"] == "Test Task"
+
+    @pytest.mark.asyncio
+    async def test_update_returns_none_if_missing(self, repository, mock_engine):
+        result = await repository.update("missing-id", {"title": "New Title"})
+        
+        assert result is None
+        assert mock_engine.count("put") == 0
+        assert mock_engine.data == {}
+
+    @pytest.mark.asyncio
+    async def test_update_rejects_invalid_merge_without_saving(self, repository, mock_engine, sample_json_data):
+        """Test that a merge which is not a valid TaskRecord raises before anything is stored."""
+        mock_engine.data["task-1"] = sample_json_data
+
+        with pytest.raises(ValidationError):
+            await repository.update("task-1", {"title": None})
+
+        assert mock_engine.count("put") == 0
+        assert mock_engine.data["task-1"] == sample_json_data
+
     # --- Test Delete ---
 
+    @pytest.mark.parametrize("existing", [True, False], ids=["hit", "miss"])
     @pytest.mark.asyncio
-    async def test_delete_removes_item(self, repository, mock_engine, sample_json_data):
-        mock_engine.read.return_value = {
-            "task-1": sample_json_data,
-            "task-2": {**sample_json_data, "id": "task-2"}
-        }
+    async def test_delete_removes_item(self, repository, mock_engine, sample_json_data, existing):
+        """Test that delete() reports whether the ID was stored, and leaves nothing behind either way."""
+        if existing:
+            mock_engine.data["task-1"] = sample_json_data
         
         result = await repository.delete("task-1")
         
-        assert result is True
-        mock_engine.write.assert_called_once()
+        assert result is existing
+        assert mock_engine.calls == [("remove", "task-1")]
+        assert mock_engine.data == {}
+
+    @pytest.mark.asyncio
+    async def test_delete_many_removes_items(self, repository, mock_engine, sample_json_data):
+        mock_engine.data = {"task-1": sample_json_data, "task-2": sample_json_data, "task-3": sample_json_data}
+        
+        result = await repository.delete_many(["task-1", "task-2", "missing-id"])
+        
+        assert result == 2
+        assert mock_engine.calls == [("remove_many", ["task-1", "task-2", "missing-id"])]
+        assert list(mock_engine.data) == ["task-3"]
+
+    # --- Test Scaling ---
+
+    @pytest.mark.slow
+    @pytest.mark.asyncio
+    async def test_save_scales_linearly(self, record_pool, sample_json_data, tmp_path):
+        """
+        Saving into a 10 000 record store must cost about the same per record as into a 1 000 record one.
+        Runs on the real JSON file engine, the only place a save could turn into a scan of the stored data:
+        that would make the big store ~10x slower, which trips the ratio check.
+        """
+        async def time_saves(stored_count, run):
+            engine = JsonStorageEngine(db_path=tmp_path / f"{stored_count}-{run}" / "database.json")
+            await engine.put_many({f"stored-{i}": sample_json_data for i in range(stored_count)})
+            # Compaction is O(N) by design and amortized over COMPACT_THRESHOLD saves, keep it out of the timing
+            engine.COMPACT_THRESHOLD = 10 * len(record_pool)
+            repository = TaskRepository(engine)
+            start = time.perf_counter()
+            for record in record_pool:
+                await repository.save(record)
+            return time.perf_counter() - start
+
+        # Best of a few runs, so a single scheduling hiccup doesn't decide the result
+        small = min([await time_saves(1_000, run) for run in range(3)])
+        large = min([await time_saves(10_000, run) for run in range(3)])
         
-        remaining_data = mock_engine.write.call_args[0][0]
-        assert "task-1" not in remaining_data
-        assert "task-2" in remaining_data
+        assert large / len(record_pool) < 0.05  # Well under the 50 ms budget per save
+        assert large < small * 3
+
+    # --- Test ID Index ---
 
     @pytest.mark.asyncio
-    async def test_delete_returns_false_if_missing(self, repository, mock_engine):
-        mock_engine.read.return_value = {}
+    async def test_repository_maintains_id_index(self, disk_engine, record_pool):
+        """
+        The engine stores items in a dict keyed by ID, in insertion order.
+        Lookups, overwrites and deletes go by key, and listing keeps the order they were saved in,
+        also for a fresh engine that rebuilds it from the snapshot plus the log.
+        """
+        disk_engine.COMPACT_THRESHOLD = 500
+        repository = TaskRepository(disk_engine)
+        await repository.save_many(record_pool)  # Past the threshold, so folded into the snapshot
+        
+        # Overwriting keeps the item in place, deleting drops only that key (both only in the log)
+        await repository.save(record_pool[3].model_copy(update={"title": "Renamed"}))
+        assert await repository.delete("task-500") is True
+        assert len(disk_engine.log_path.read_bytes().splitlines()) == 2
         
-        result = await repository.delete("missing-id")
+        reloaded = TaskRepository(JsonStorageEngine(db_path=disk_engine.db_path))
+        found = await reloaded.get_by_id("task-737")
+        assert found.title == "Task 737"
         
-        assert result is False
-        mock_engine.write.assert_not_called()
\ No newline at end of file
+        result = await reloaded.get_all()
+        assert len(result) == 999
+        assert [task.id for task in result[:5]] == ["task-0", "task-1", "task-2", "task-3", "task-4"]
+        assert result[3].title == "Renamed"
+        assert "task-500" not in {task.id for task in result}